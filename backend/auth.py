@@ -4,11 +4,13 @@ Provides authentication utilities for Azure AI services.
 """
 import os
 import logging
+import threading
+import time
 from typing import Optional
 
 from azure.identity import AzureCliCredential, InteractiveBrowserCredential, ChainedTokenCredential
 from azure.ai.inference import ChatCompletionsClient
-from azure.core.credentials import TokenCredential
+from azure.core.credentials import AccessToken, TokenCredential
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -19,6 +21,11 @@ logger = logging.getLogger(__name__)
 # Cached credential instance (lazy initialization)
 _credential: Optional[TokenCredential] = None
 
+# Cached access tokens by scope, refreshed shortly before they expire
+_token_cache: dict[str, AccessToken] = {}
+_token_lock = threading.Lock()
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+
 
 def get_azure_credential() -> TokenCredential:
     """
@@ -66,6 +73,31 @@ def get_token(credential: TokenCredential, scope: str) -> str:
     return token.token
 
 
+def get_cached_token(scope: str) -> AccessToken:
+    """
+    Get an access token for the specified scope, reusing a cached one until
+    it is within TOKEN_REFRESH_MARGIN_SECONDS of expiry.
+
+    Blocking - call via asyncio.to_thread from async code.
+
+    Args:
+        scope: The scope to request a token for (e.g., "https://cognitiveservices.azure.com/.default")
+
+    Returns:
+        AccessToken with token string and expires_on timestamp
+
+    Raises:
+        azure.core.exceptions.ClientAuthenticationError: If authentication fails
+    """
+    with _token_lock:
+        token = _token_cache.get(scope)
+        if token is None or token.expires_on - time.time() <= TOKEN_REFRESH_MARGIN_SECONDS:
+            logger.info("Requesting token for scope: %s", scope)
+            token = get_azure_credential().get_token(scope)
+            _token_cache[scope] = token
+        return token
+
+
 def get_inference_client(credential: Optional[TokenCredential] = None) -> ChatCompletionsClient:
     """
     Get Azure AI Inference ChatCompletionsClient configured for the project.
@@ -15,7 +15,7 @@ from azure.ai.inference.models import SystemMessage, UserMessage, AssistantMessa
 
 from auth import get_inference_client
 from tools import TOOL_DEFINITIONS, execute_tool
-from modes import Mode, get_mode, get_current_mode, set_current_mode, store_generated_mode
+from modes import Mode, get_mode, get_current_mode, get_mode_payload, set_current_mode, store_generated_mode
 from persona import generate_persona
 from mode_generator import generate_mode
 
@@ -449,18 +449,7 @@ async def handle_chat_message(text: str, websocket: WebSocket) -> None:
         await websocket.send_text(json.dumps({
             "type": "mode_switch",
             "payload": {
-                "mode": {
-                    "id": new_mode.id,
-                    "name": new_mode.name,
-                    "company_name": new_mode.company_name,
-                    "tagline": new_mode.tagline,
-                    "theme": new_mode.theme.model_dump(),
-                    "tabs": [tab.model_dump() for tab in new_mode.tabs],
-                    "defaultMetrics": [m.model_dump() for m in new_mode.default_metrics],
-                    "background_image": new_mode.background_image,
-                    "hero_image": new_mode.hero_image,
-                    "chat_image": new_mode.chat_image,
-                },
+                "mode": get_mode_payload(new_mode),
                 "persona": _current_persona
             }
         }))
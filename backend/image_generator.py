@@ -11,7 +11,7 @@ from pathlib import Path
 
 import httpx
 
-from auth import get_azure_credential
+from auth import get_cached_token
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +39,7 @@ def _get_image_url() -> str:
 
 async def _get_bearer_token() -> str:
     """Get a bearer token for Azure AI services."""
-    credential = get_azure_credential()
-    token = await asyncio.to_thread(credential.get_token, _TOKEN_SCOPE)
+    token = await asyncio.to_thread(get_cached_token, _TOKEN_SCOPE)
     return token.token
 
 
@@ -2,9 +2,12 @@
 Presto-Change-O Backend
 FastAPI application with WebSocket endpoint for real-time communication.
 """
+import asyncio
 import json
 import logging
+import logging.handlers
 import os
+import queue
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -19,7 +22,7 @@ from auth import get_inference_client
 from chat import handle_chat_message, clear_history, ensure_persona, get_session_seed, build_system_prompt
 from voice import handle_voice_session
 from modes import (
-    get_current_mode, get_voice_preference, set_voice_preference,
+    get_current_mode, get_mode_payload, get_voice_preference, set_voice_preference,
     AVAILABLE_VOICES,
 )
 from tools import TOOL_DEFINITIONS, execute_tool
@@ -27,8 +30,25 @@ from tools import TOOL_DEFINITIONS, execute_tool
 MODEL_DEPLOYMENT = os.getenv("AZURE_MODEL_DEPLOYMENT", "gpt-5-mini")
 TAB_CONTENT_DEPLOYMENT = os.getenv("AZURE_TAB_CONTENT_DEPLOYMENT", "Kimi-K2.5")
 
-# Configure logging
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records as-is, leaving formatting to the listener's handlers."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats and copies the record on the caller's
+        # thread; the listener runs in-process, so the record can go unchanged
+        return record
+
+
+# Configure logging. Root handlers are moved behind a queue so formatting and
+# console I/O happen on a listener thread; the event loop only enqueues records.
 logging.basicConfig(level=logging.INFO)
+_root_logger = logging.getLogger()
+_log_listener = logging.handlers.QueueListener(
+    queue.SimpleQueue(), *_root_logger.handlers, respect_handler_level=True
+)
+_root_logger.handlers = [_DeferredQueueHandler(_log_listener.queue)]
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
 
@@ -68,6 +88,9 @@ def verify_llm_connection() -> None:
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
     logger.info("Presto-Change-O backend starting...")
+    # uvicorn[standard] picks uvloop automatically where available (not on Windows);
+    # the voice relay is dominated by event-loop scheduling, so log which loop is active
+    logger.info("Event loop: %s", type(asyncio.get_running_loop()).__module__)
 
     # Verify LLM connection before accepting requests
     verify_llm_connection()
@@ -77,6 +100,8 @@ async def lifespan(app: FastAPI):
     logger.info("Voice WebSocket endpoint available at ws://localhost:8000/voice")
     yield
     logger.info("Presto-Change-O backend shutting down...")
+    # Flush anything still queued before the process exits
+    _log_listener.stop()
 
 
 app = FastAPI(
@@ -117,18 +142,7 @@ async def get_state():
     persona = ensure_persona(current_mode.id)
 
     return {
-        "mode": {
-            "id": current_mode.id,
-            "name": current_mode.name,
-            "company_name": current_mode.company_name,
-            "tagline": current_mode.tagline,
-            "theme": current_mode.theme.model_dump(),
-            "tabs": [tab.model_dump() for tab in current_mode.tabs],
-            "defaultMetrics": [m.model_dump() for m in current_mode.default_metrics],
-            "background_image": current_mode.background_image,
-            "hero_image": current_mode.hero_image,
-            "chat_image": current_mode.chat_image,
-        },
+        "mode": get_mode_payload(current_mode),
         "persona": persona,
         "voice_preference": get_voice_preference(),
     }
@@ -273,6 +273,37 @@ def get_mode(mode_id: str) -> Mode | None:
     return None
 
 
+# Frontend payload per mode: {mode_id: (mode, payload)}. Modes are replaced
+# (model_copy / regeneration) rather than mutated, so an identity check keeps it fresh.
+_mode_payload_cache: dict[str, tuple[Mode, dict]] = {}
+
+
+def get_mode_payload(mode: Mode) -> dict:
+    """
+    Get the frontend representation of a mode (as sent in mode_switch and /api/state).
+
+    The pydantic dumps only depend on the mode definition, so the result is cached
+    per mode object. Callers must treat it as read-only.
+    """
+    cached = _mode_payload_cache.get(mode.id)
+    if cached is not None and cached[0] is mode:
+        return cached[1]
+    payload = {
+        "id": mode.id,
+        "name": mode.name,
+        "company_name": mode.company_name,
+        "tagline": mode.tagline,
+        "theme": mode.theme.model_dump(),
+        "tabs": [tab.model_dump() for tab in mode.tabs],
+        "defaultMetrics": [m.model_dump() for m in mode.default_metrics],
+        "background_image": mode.background_image,
+        "hero_image": mode.hero_image,
+        "chat_image": mode.chat_image,
+    }
+    _mode_payload_cache[mode.id] = (mode, payload)
+    return payload
+
+
 def get_all_modes() -> list[Mode]:
     """Get all available mode configurations."""
     return list(MODES.values())
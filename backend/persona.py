@@ -9,6 +9,21 @@ from faker import Faker
 from pydantic import BaseModel
 
 
+# ISO date strings keyed by ordinal. Generated dates fall in narrow windows
+# (e.g. the last 30 days), so the same days recur across transactions.
+_iso_date_cache: dict[int, str] = {}
+
+
+def _iso_date(d: date) -> str:
+    """Return the ISO string for a date, reusing cached strings for repeated days."""
+    ordinal = d.toordinal()
+    iso = _iso_date_cache.get(ordinal)
+    if iso is None:
+        iso = d.isoformat()
+        _iso_date_cache[ordinal] = iso
+    return iso
+
+
 # =============================================================================
 # Banking Models
 # =============================================================================
@@ -118,7 +133,7 @@ def generate_banking_persona(seed: int) -> BankingPersona:
     for _ in range(num_transactions):
         is_debit = fake.pybool()
         transactions.append(Transaction(
-            date=fake.date_between(start_date="-30d", end_date="today").isoformat(),
+            date=_iso_date(fake.date_between(start_date="-30d", end_date="today")),
             description=fake.company() if is_debit else fake.bs().title(),
             amount=round(fake.pyfloat(min_value=5, max_value=500), 2) if is_debit else round(fake.pyfloat(min_value=100, max_value=3000), 2),
             category="debit" if is_debit else "credit"
@@ -180,7 +195,7 @@ def generate_insurance_persona(seed: int) -> InsurancePersona:
             premium=premium,
             deductible=float(deductible),
             policy_number=fake.bothify("POL-####-????").upper(),
-            renewal_date=fake.date_between(start_date="+30d", end_date="+365d").isoformat()
+            renewal_date=_iso_date(fake.date_between(start_date="+30d", end_date="+365d"))
         ))
 
     # Generate 0-2 claims history
@@ -192,7 +207,7 @@ def generate_insurance_persona(seed: int) -> InsurancePersona:
     for _ in range(num_claims):
         claims.append(Claim(
             claim_id=fake.bothify("CLM-########").upper(),
-            date=fake.date_between(start_date="-2y", end_date="-30d").isoformat(),
+            date=_iso_date(fake.date_between(start_date="-2y", end_date="-30d")),
             type=fake.random_element(claim_types),
             amount=round(fake.pyfloat(min_value=500, max_value=15000), 2),
             status=fake.random_element(claim_statuses)
@@ -230,7 +245,7 @@ def generate_healthcare_persona(seed: int) -> HealthcarePersona:
     for _ in range(num_appointments):
         specialty = fake.random_element(specialties)
         appointments.append(Appointment(
-            date=fake.date_between(start_date="+1d", end_date="+90d").isoformat(),
+            date=_iso_date(fake.date_between(start_date="+1d", end_date="+90d")),
             time=fake.random_element(["9:00 AM", "10:30 AM", "1:00 PM", "2:30 PM", "4:00 PM"]),
             provider=f"Dr. {fake.last_name()}",
             specialty=specialty,
@@ -273,7 +288,7 @@ def generate_healthcare_persona(seed: int) -> HealthcarePersona:
     return HealthcarePersona(
         name="Marco Casalaina",
         member_id=fake.bothify("MBR-#########").upper(),
-        date_of_birth=fake.date_of_birth(minimum_age=25, maximum_age=75).isoformat(),
+        date_of_birth=_iso_date(fake.date_of_birth(minimum_age=25, maximum_age=75)),
         primary_care_provider=f"Dr. {fake.last_name()}",
         plan_name=fake.random_element(plan_names),
         deductible=float(deductible),
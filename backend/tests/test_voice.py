@@ -0,0 +1,146 @@
+"""Tests for the voice relay's outbound batching."""
+import asyncio
+import json
+import threading
+import time
+
+import voice
+from voice import VoiceSessionState, TRANSCRIPT_BATCH_WINDOW_SECONDS
+
+
+async def _next_message(session_state: VoiceSessionState) -> dict:
+    return json.loads(await asyncio.wait_for(session_state.browser_queue.get(), 1))
+
+
+def test_flush_sends_batch_already_taken_by_flusher():
+    async def scenario():
+        session_state = VoiceSessionState()
+        flusher = asyncio.create_task(voice._transcript_flusher(session_state))
+        session_state.transcript_queue.put_nowait("Hello")
+        await asyncio.sleep(0)  # flusher takes the only delta; the queue is empty again
+        assert session_state.transcript_queue.empty()
+
+        start = time.perf_counter()
+        session_state.flush_transcript()
+        message = await _next_message(session_state)
+        elapsed = time.perf_counter() - start
+        flusher.cancel()
+        return message, elapsed
+
+    message, elapsed = asyncio.run(scenario())
+    assert message["text"] == "Hello"
+    assert elapsed < TRANSCRIPT_BATCH_WINDOW_SECONDS / 2
+
+
+def test_idle_flush_does_not_cut_next_batch_short():
+    async def scenario():
+        session_state = VoiceSessionState()
+        flusher = asyncio.create_task(voice._transcript_flusher(session_state))
+        await asyncio.sleep(0)
+        session_state.flush_transcript()  # nothing pending
+
+        start = time.perf_counter()
+        session_state.transcript_queue.put_nowait("Hel")
+        await asyncio.sleep(TRANSCRIPT_BATCH_WINDOW_SECONDS / 5)
+        session_state.transcript_queue.put_nowait("lo")
+        message = await _next_message(session_state)
+        elapsed = time.perf_counter() - start
+        flusher.cancel()
+        return message, elapsed
+
+    message, elapsed = asyncio.run(scenario())
+    assert message["text"] == "Hello"
+    assert elapsed >= TRANSCRIPT_BATCH_WINDOW_SECONDS * 0.9
+
+
+def test_interruption_sends_pending_transcript_before_speech_started():
+    async def scenario():
+        session_state = VoiceSessionState()
+        flusher = asyncio.create_task(voice._transcript_flusher(session_state))
+        session_state.transcript_queue.put_nowait("Hel")
+        await asyncio.sleep(0)  # flusher has opened a batch with the first delta
+        session_state.transcript_queue.put_nowait("lo")
+
+        await voice._on_speech_started({}, session_state)
+        messages = [await _next_message(session_state), await _next_message(session_state)]
+        # Let the flusher's window run out: it must find nothing left to send
+        await asyncio.sleep(TRANSCRIPT_BATCH_WINDOW_SECONDS * 2)
+        flusher.cancel()
+        return messages, session_state.browser_queue.empty()
+
+    messages, nothing_after = asyncio.run(scenario())
+    assert messages[0] == {"type": "transcript", "role": "assistant", "text": "Hello"}
+    assert messages[1] == {"type": "speech_started"}
+    assert nothing_after
+
+
+def test_replaced_visualization_is_still_reaped_at_teardown(monkeypatch):
+    release = threading.Event()
+
+    class _BlockingClient:
+        def complete(self, **kwargs):
+            release.wait()
+            raise RuntimeError("request abandoned")
+
+    monkeypatch.setattr(voice, "_get_viz_client", _BlockingClient)
+    monkeypatch.setattr(voice, "ensure_persona", lambda mode_id: {})
+    event = {
+        "call_id": "call-1",
+        "name": "request_visualization",
+        "arguments": json.dumps({"vis_type": "chart", "description": "Monthly sales"}),
+    }
+
+    async def scenario():
+        session_state = VoiceSessionState()
+        await voice._on_function_call_arguments_done(event, session_state)
+        await asyncio.sleep(0.01)  # the first task is now waiting on the API call
+        await voice._on_function_call_arguments_done({**event, "call_id": "call-2"}, session_state)
+        replacement = session_state.pending_visualizations["chart"]
+        await asyncio.sleep(0.01)  # the replaced task's cleanup runs
+        still_tracked = session_state.pending_visualizations.get("chart") is replacement
+
+        cancelled = session_state.cancel_all_pending()
+        await asyncio.gather(*cancelled, return_exceptions=True)
+        return still_tracked, replacement in cancelled and replacement.cancelled()
+
+    try:
+        still_tracked, reaped = asyncio.run(scenario())
+    finally:
+        release.set()
+    assert still_tracked
+    assert reaped
+
+
+def test_cancelled_visualization_holds_gate_slot_until_call_finishes(monkeypatch):
+    release = threading.Event()
+
+    class _BlockingClient:
+        def complete(self, **kwargs):
+            release.wait()
+            raise RuntimeError("request abandoned")
+
+    gate = voice._ShortestJobFirstGate(1)
+    monkeypatch.setattr(voice, "_VIZ_GATE", gate)
+    monkeypatch.setattr(voice, "_get_viz_client", _BlockingClient)
+    monkeypatch.setattr(voice, "ensure_persona", lambda mode_id: {})
+
+    async def scenario():
+        session_state = VoiceSessionState()
+        task = asyncio.create_task(
+            voice._generate_visualization_background(session_state, "chart", "Monthly sales", session_state.epoch)
+        )
+        await asyncio.sleep(0.01)  # the API call is running on a worker thread
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        held_after_cancel = gate._active
+
+        release.set()
+        await asyncio.sleep(0.05)  # the worker finishes and hands the slot back
+        return held_after_cancel, gate._active
+
+    try:
+        held_after_cancel, held_after_finish = asyncio.run(scenario())
+    finally:
+        release.set()
+    assert held_after_cancel == 1
+    assert held_after_finish == 0
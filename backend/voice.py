@@ -4,20 +4,29 @@ Handles voice sessions with gpt-realtime via bidirectional WebSocket relay.
 Supports async visualization generation via background Chat API calls.
 """
 import asyncio
+import base64
+import functools
+import heapq
+import itertools
 import json
 import logging
 import os
 import re
-from typing import Any
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 import websockets
+from websockets.asyncio.client import connect as ws_connect
 from fastapi import WebSocket
 
+from azure.ai.inference import ChatCompletionsClient
 from azure.ai.inference.models import SystemMessage, UserMessage, AssistantMessage
 
-from auth import get_azure_credential, get_inference_client
+from auth import get_cached_token, get_inference_client
 from tools import TOOL_DEFINITIONS, VOICE_TOOL_DEFINITIONS, execute_tool
-from modes import get_current_mode, set_current_mode, get_voice_preference
+from modes import get_current_mode, get_mode_payload, set_current_mode, get_voice_preference
 from chat import build_system_prompt, ensure_persona, detect_mode_switch, get_session_seed
 from persona import generate_persona
 
@@ -30,17 +39,194 @@ MODEL_DEPLOYMENT = os.getenv("AZURE_MODEL_DEPLOYMENT", "gpt-5-mini")
 VIZ_DEPLOYMENT = os.getenv("AZURE_VIZ_DEPLOYMENT", "") or os.getenv("AZURE_MODEL_DEPLOYMENT", "gpt-5-mini")
 REALTIME_API_VERSION = "2025-04-01-preview"
 
+# Background visualization calls are blocking SDK requests; give them their own
+# sized pool so concurrent sessions aren't capped by the default executor
+VOICE_VIZ_MAX_PARALLEL = int(os.getenv("VOICE_VIZ_MAX_PARALLEL", "32"))
+_VIZ_EXECUTOR = ThreadPoolExecutor(max_workers=VOICE_VIZ_MAX_PARALLEL, thread_name_prefix="voice-viz")
+
+# Shared inference client for background visualizations (lazy initialization)
+_viz_client: ChatCompletionsClient | None = None
+_viz_client_lock = threading.Lock()
+
+# Estimated cost of a background visualization: description length plus this
+# much per message of conversation history sent along with it
+VIZ_COST_PER_HISTORY_MESSAGE = 20
+
+# gpt-realtime WebSocket URI, built once from the endpoint
+# Format: wss://{host}/openai/realtime?api-version={version}&deployment={deployment}
+# Host is the endpoint without protocol and /models path (chat endpoint has it, realtime doesn't use it)
+_REALTIME_HOST = (
+    AZURE_ENDPOINT.removeprefix("https://").removeprefix("http://").rstrip("/").removesuffix("/models")
+)
+REALTIME_URI = f"wss://{_REALTIME_HOST}/openai/realtime?api-version={REALTIME_API_VERSION}&deployment={REALTIME_DEPLOYMENT}"
+
 MAX_TRANSCRIPT_HISTORY = 20
 
+# Voice system prompts memoized per base prompt
+_VOICE_PROMPT_CACHE_MAX_SIZE = 64
+
+# JSON (de)serialization for the relay. orjson is a C implementation and much
+# faster than stdlib json on the per-event hot paths; .decode() keeps text frames.
+# Falls back to stdlib json (same compact output) if orjson isn't installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter.
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        """Serialize obj to a JSON string with orjson."""
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> str:
+        """Serialize obj to a compact JSON string with stdlib json."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+# Wake word that may introduce a mode switch, matched case-insensitively
+# without allocating a lowercased copy of every transcript. Only a leading
+# word boundary: transcription often fuses "Presto Chango" into "Prestochango",
+# which must still count, while words that merely contain it (e.g.
+# "impresto") don't.
+_WAKE_RE = re.compile(r"\bpresto", re.IGNORECASE)
+
+
+# Constant outbound messages, serialized once at import
+SPEECH_STARTED = _dumps({"type": "speech_started"})
+SPEECH_STOPPED = _dumps({"type": "speech_stopped"})
+RESP_CANCEL = _dumps({"type": "response.cancel"})
+RESP_CREATE = _dumps({"type": "response.create"})
+STATUS_CONNECTED = _dumps({"type": "status", "status": "connected"})
+STATUS_DISCONNECTED = _dumps({"type": "status", "status": "disconnected"})
+MODE_GENERATING = _dumps({"type": "mode_generating", "payload": {"industry": "new mode"}})
+MODE_GENERATING_CANCEL = _dumps({"type": "mode_generating_cancel", "payload": {}})
+
+
+def _error_frame(message: str) -> str:
+    """Build an error message for the browser; only the message text is encoded."""
+    return f'{{"type":"error","error":{_dumps(message)}}}'
+
+
+# input_audio_buffer.append is built by concatenation: base64 is JSON-safe, so
+# there is nothing to escape and no dict to build per chunk. Kept as bytes so
+# the base64 output is never decoded to str only to be re-encoded as UTF-8.
+AUDIO_APPEND_PREFIX = b'{"type":"input_audio_buffer.append","audio":"'
+AUDIO_APPEND_SUFFIX = b'"}'
+
+
+# gpt-realtime frames are at most a few hundred KB (session events, audio
+# deltas); cap inbound messages well above that instead of leaving them
+# unbounded, and let outbound bursts buffer before the writer pauses
+REALTIME_MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+REALTIME_WRITE_LIMIT_BYTES = 1024 * 1024
+
+# Handshake statuses worth retrying (throttled / briefly unavailable); retries
+# back off exponentially from REALTIME_CONNECT_BACKOFF_SECONDS
+REALTIME_RETRY_STATUSES = frozenset({429, 503})
+REALTIME_CONNECT_RETRIES = 2
+REALTIME_CONNECT_BACKOFF_SECONDS = 0.25
+
+
+# Bound on each per-session outbound queue. Producers wait when a queue is
+# full, which applies backpressure without blocking on socket I/O directly.
+OUTBOUND_QUEUE_SIZE = 64
+
+# Browser control messages queued together are corked into one text frame,
+# separated by an ASCII record separator (never present in JSON output),
+# up to this many characters per frame
+BROWSER_FRAME_SEPARATOR = "\x1e"
+BROWSER_FRAME_MAX_CHARS = 16 * 1024
+
+# Outbound audio batching: assistant audio deltas that arrive close together
+# are coalesced into a single browser frame. Caps keep one frame bounded.
+AUDIO_BATCH_WINDOW_SECONDS = 0.015
+AUDIO_BATCH_MAX_CHUNKS = 32
+AUDIO_BATCH_MAX_BYTES = 64 * 1024
+
+# Assistant transcript deltas are a few tokens each; coalesce those arriving
+# within this window into one browser frame (flushed early at end of audio)
+TRANSCRIPT_BATCH_WINDOW_SECONDS = 0.025
+
+# Upper bound on the best-effort error/disconnect notices sent during teardown,
+# so a stalled browser socket can't hold the session open
+BROWSER_FINAL_SEND_TIMEOUT_SECONDS = 0.5
+
+
+class _Mailbox:
+    """
+    Single-consumer deque + future mailbox for the audio paths.
+
+    Cheaper per item than asyncio.Queue (no getter/putter bookkeeping); the
+    bounded deque discards the oldest item when full, so producers never wait.
+    """
+
+    def __init__(self, maxlen: int):
+        self._items: deque = deque(maxlen=maxlen)
+        self._waiter: asyncio.Future | None = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Any) -> None:
+        self._items.append(item)
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def popleft(self) -> Any:
+        return self._items.popleft()
+
+    def drain(self) -> list:
+        items = list(self._items)
+        self._items.clear()
+        return items
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    async def wait(self) -> None:
+        """Wait until at least one item is available."""
+        while not self._items:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
 
 class VoiceSessionState:
     """Tracks state for an active voice session."""
 
     def __init__(self):
-        self.transcript_history: list[dict] = []
+        # Conversation generation, bumped on every mode switch; background work
+        # captures it at launch and drops its results if it has changed
+        self.epoch: int = 0
+        self.transcript_history: deque[dict] = deque(maxlen=MAX_TRANSCRIPT_HISTORY)
+        # Chat API messages kept 1:1 with transcript_history (None while the
+        # last assistant message is still streaming)
+        self._sdk_messages: deque[UserMessage | AssistantMessage | None] = deque(maxlen=MAX_TRANSCRIPT_HISTORY)
         self.model_is_responding: bool = False
         self.pending_visualizations: dict[str, asyncio.Task] = {}
         self.deferred_notifications: list[dict] = []
+        self.audio_out = _Mailbox(OUTBOUND_QUEUE_SIZE)
+        self.mic_audio = _Mailbox(OUTBOUND_QUEUE_SIZE)
+        self.browser_queue: asyncio.Queue[str] = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self.realtime_queue: asyncio.Queue[str] = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self.transcript_queue: asyncio.Queue[str] = asyncio.Queue()
+        # Deltas taken off transcript_queue by the flusher and not yet sent;
+        # non-empty exactly while a batch window is open
+        self.transcript_batch: list[str] = []
+        self.transcript_flush = asyncio.Event()
+
+    async def send_to_browser(self, message: str) -> None:
+        """Queue a text message for the browser sender task."""
+        await self.browser_queue.put(message)
+
+    async def send_to_realtime(self, message: str) -> None:
+        """Queue a message for the gpt-realtime sender task."""
+        await self.realtime_queue.put(message)
 
     def add_transcript(self, role: str, text: str) -> None:
         """Add a transcript entry to rolling conversation history.
@@ -51,39 +237,110 @@ class VoiceSessionState:
         """
         if not text or not text.strip():
             return
+        self.finish_assistant_message()
+        # Bounded deques keep the last N messages
         self.transcript_history.append({"role": role, "content": text})
-        # Keep last N messages
-        if len(self.transcript_history) > MAX_TRANSCRIPT_HISTORY:
-            self.transcript_history.pop(0)
+        self._sdk_messages.append(
+            UserMessage(content=text) if role == "user" else AssistantMessage(content=text)
+        )
 
     def append_assistant_delta(self, text: str) -> None:
         """Append a delta chunk to the current assistant message.
 
         Assistant transcripts arrive as many small deltas. This accumulates
-        them into a single transcript entry.
+        them into a single transcript entry as a list of parts (joined by
+        finish_assistant_message) to avoid quadratic string concatenation.
         """
         if not text:
             return
         if (self.transcript_history
                 and self.transcript_history[-1]["role"] == "assistant"):
-            self.transcript_history[-1]["content"] += text
+            last = self.transcript_history[-1]
+            parts = last.get("content_parts")
+            if parts is None:
+                parts = last["content_parts"] = [last.pop("content")]
+                self._sdk_messages[-1] = None
+            parts.append(text)
         else:
-            self.transcript_history.append({"role": "assistant", "content": text})
-            if len(self.transcript_history) > MAX_TRANSCRIPT_HISTORY:
-                self.transcript_history.pop(0)
-
-    def get_chat_messages(self) -> list[dict]:
-        """Get transcript history formatted for Chat API messages."""
-        return list(self.transcript_history)
-
-    def cancel_all_pending(self) -> None:
-        """Cancel all pending background visualization tasks."""
-        for vis_type, task in self.pending_visualizations.items():
-            if not task.done():
-                task.cancel()
-                logger.info(f"Cancelled pending visualization: {vis_type}")
+            self.transcript_history.append({"role": "assistant", "content_parts": [text]})
+            self._sdk_messages.append(None)
+
+    def finish_assistant_message(self) -> None:
+        """Join the accumulated parts of the current assistant message into its content."""
+        if (self.transcript_history
+                and "content_parts" in self.transcript_history[-1]):
+            last = self.transcript_history[-1]
+            last["content"] = "".join(last.pop("content_parts"))
+            self._sdk_messages[-1] = AssistantMessage(content=last["content"])
+
+    def clear_transcript(self) -> None:
+        """Start a new conversation epoch with empty history (e.g. on a mode switch).
+
+        Fresh deques are installed rather than clearing the old ones in place,
+        so anything still holding the previous history is unaffected.
+        """
+        self.epoch += 1
+        self.transcript_history = deque(maxlen=MAX_TRANSCRIPT_HISTORY)
+        self._sdk_messages = deque(maxlen=MAX_TRANSCRIPT_HISTORY)
+
+    def get_sdk_messages(self) -> list[UserMessage | AssistantMessage]:
+        """Get transcript history as Chat API message objects, built as messages complete."""
+        messages = list(self._sdk_messages)
+        if messages and messages[-1] is None:
+            messages[-1] = AssistantMessage(content="".join(self.transcript_history[-1]["content_parts"]))
+        return messages
+
+    def flush_transcript(self) -> None:
+        """Ask the transcript flusher to send batched assistant text now.
+
+        Only pending text is flushed: with nothing batched or queued the request
+        is dropped, so it can't cut short the window of a later batch.
+        """
+        if self.transcript_batch or not self.transcript_queue.empty():
+            self.transcript_flush.set()
+
+    def take_transcript(self) -> str | None:
+        """Take all assistant transcript text not yet sent as one browser message.
+
+        Drains both the flusher's open batch and the queue, so the flusher finds
+        nothing left to send. Returns None if there is no pending text.
+        """
+        parts = self.transcript_batch
+        while not self.transcript_queue.empty():
+            parts.append(self.transcript_queue.get_nowait())
+        if not parts:
+            return None
+        text = "".join(parts)
+        parts.clear()
+        return _dumps({"type": "transcript", "role": "assistant", "text": text})
+
+    def push_audio(self, chunk: str) -> None:
+        """Queue an assistant audio chunk, discarding the oldest one if the mailbox is full.
+
+        Stale audio is worthless once playback has moved on, so under congestion a
+        small drop is preferable to stalling the gpt-realtime receive loop.
+        """
+        self.audio_out.put(chunk)
+
+    def clear_audio_queue(self) -> None:
+        """Drop assistant audio that has not been forwarded yet (e.g. on interruption)."""
+        self.audio_out.clear()
+
+    def cancel_all_pending(self) -> list[asyncio.Task]:
+        """Cancel all pending background visualization tasks.
+
+        Works on a snapshot so the tasks' own cleanup can't mutate the dict
+        mid-iteration. Returns the cancelled tasks for callers that want to
+        await their reclamation.
+        """
+        tasks = list(self.pending_visualizations.values())
         self.pending_visualizations.clear()
         self.deferred_notifications.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            logger.info("Cancelled %d pending visualization(s)", len(tasks))
+        return tasks
 
 
 def build_realtime_tools() -> list[dict[str, Any]]:
@@ -105,40 +362,115 @@ def build_realtime_tools() -> list[dict[str, Any]]:
     return realtime_tools
 
 
+# VOICE_TOOL_DEFINITIONS is static, so convert it once at import
+_REALTIME_TOOLS = build_realtime_tools()
+
+# session.update sent on every voice mode switch: only the instructions vary,
+# so the serialized tools subtree is spliced in rather than re-encoded
+_SESSION_UPDATE_PREFIX = '{"type":"session.update","session":{"tools":' + _dumps(_REALTIME_TOOLS) + ',"instructions":'
+_SESSION_UPDATE_SUFFIX = "}}"
+
+
+# Voice replacement for the TOOLS line of a mode's system prompt
+VOICE_TOOLS_INSTRUCTION = (
+    "TOOLS: Use request_visualization to show charts or metrics. "
+    "After requesting, KEEP TALKING about the data - don't wait for it to load."
+)
+
+# Match both pre-built mode format "TOOLS: show_chart (...) and show_metrics."
+# and generated mode format "TOOLS: show_chart(...), show_metrics. ..."
+# No DOTALL: the match must stop at the end of the TOOLS line so the rules
+# that follow it in the prompt are kept.
+_TOOLS_RE = re.compile(r"TOOLS:.*?show_chart.*?show_metrics\..*")
+
+
+@functools.lru_cache(maxsize=_VOICE_PROMPT_CACHE_MAX_SIZE)
 def build_voice_system_prompt(base_prompt: str) -> str:
     """
     Modify system prompt for voice mode by replacing tool references.
 
     Replaces 'TOOLS: show_chart ... show_metrics' line with voice-specific
     instructions to use request_visualization and keep talking.
+
+    Memoized: switching back to a mode with the same base prompt reuses its
+    voice prompt instead of re-running the regex.
     """
-    # Replace the TOOLS line with voice-specific instructions
-    voice_tools_instruction = (
-        "TOOLS: Use request_visualization to show charts or metrics. "
-        "After requesting, KEEP TALKING about the data - don't wait for it to load."
-    )
-    # Match both pre-built mode format "TOOLS: show_chart (...) and show_metrics."
-    # and generated mode format "TOOLS: show_chart(...), show_metrics. ..."
-    modified = re.sub(
-        r"TOOLS:.*?show_chart.*?show_metrics\..*",
-        voice_tools_instruction,
-        base_prompt
-    )
-    return modified
+    return _TOOLS_RE.sub(VOICE_TOOLS_INSTRUCTION, base_prompt)
+
+
+class _ShortestJobFirstGate:
+    """
+    Admit at most `limit` concurrent jobs; when saturated, admit the waiter
+    with the lowest estimated cost first (FIFO among equal costs).
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, cost: int) -> None:
+        if self._active < self._limit and not self._waiters:
+            self._active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (cost, next(self._seq), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # A slot handed over just before cancellation must be passed on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        # Hand the slot straight to the cheapest live waiter, if any
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+
+# Shared across sessions so short requests overtake long ones under load;
+# sized to the pool so the executor's own FIFO queue never comes into play
+_VIZ_GATE = _ShortestJobFirstGate(VOICE_VIZ_MAX_PARALLEL)
+
+
+def _release_viz_slot(loop: asyncio.AbstractEventLoop, future: Any) -> None:
+    """Done callback of a viz executor job: hand its gate slot back on the event loop."""
+    try:
+        loop.call_soon_threadsafe(_VIZ_GATE.release)
+    except RuntimeError:
+        pass  # Loop already closed (shutdown); the gate goes with it
+
+
+def _get_viz_client() -> ChatCompletionsClient:
+    """Get the shared inference client for background visualizations."""
+    global _viz_client
+
+    with _viz_client_lock:
+        if _viz_client is None:
+            _viz_client = get_inference_client()
+        return _viz_client
 
 
 async def _generate_visualization_background(
     session_state: VoiceSessionState,
     vis_type: str,
     description: str,
-    websocket: WebSocket,
-    realtime_ws: Any,
+    epoch: int,
 ) -> None:
     """
     Background task: call Chat Completions API to generate actual chart/metrics data.
 
+    Results are dropped if the session's conversation epoch has moved on
+    (mode switch) since the task was launched at `epoch`.
+
     1. Builds Chat API request with conversation context + full TOOL_DEFINITIONS
-    2. Calls inference API (non-streaming, via asyncio.to_thread)
+    2. Calls inference API (non-streaming, in the _VIZ_EXECUTOR pool)
     3. Extracts tool calls, runs execute_tool()
     4. Sends tool_result to frontend
     5. Queues notification for voice model
@@ -149,12 +481,7 @@ async def _generate_visualization_background(
         system_prompt = build_system_prompt(current_mode, persona)
 
         # Build messages: system prompt + conversation transcript + visualization request
-        messages = [SystemMessage(content=system_prompt)]
-        for msg in session_state.get_chat_messages():
-            if msg["role"] == "user":
-                messages.append(UserMessage(content=msg["content"]))
-            else:
-                messages.append(AssistantMessage(content=msg["content"]))
+        messages = [SystemMessage(content=system_prompt), *session_state.get_sdk_messages()]
 
         # Add explicit instruction for what to generate
         if vis_type == "chart":
@@ -162,17 +489,28 @@ async def _generate_visualization_background(
         else:
             messages.append(UserMessage(content=f"Show me metrics: {description}. Use the show_metrics tool."))
 
-        logger.info(f"Background viz: calling Chat API ({VIZ_DEPLOYMENT}) with {len(messages)} messages for '{description}'")
+        logger.info("Background viz: calling Chat API (%s) with %d messages for '%s'", VIZ_DEPLOYMENT, len(messages), description)
 
-        client = get_inference_client()
+        client = _get_viz_client()
 
-        # Run synchronous API call in thread to avoid blocking event loop
-        response = await asyncio.to_thread(
-            client.complete,
-            model=VIZ_DEPLOYMENT,
-            messages=messages,
-            tools=TOOL_DEFINITIONS,
-        )
+        # Run synchronous API call in the viz pool to avoid blocking event loop,
+        # shortest estimated job first when the pool is saturated
+        cost = len(description) + VIZ_COST_PER_HISTORY_MESSAGE * len(session_state.transcript_history)
+        await _VIZ_GATE.acquire(cost)
+        try:
+            future = _VIZ_EXECUTOR.submit(
+                client.complete,
+                model=VIZ_DEPLOYMENT,
+                messages=messages,
+                tools=TOOL_DEFINITIONS,
+            )
+        except BaseException:
+            _VIZ_GATE.release()
+            raise
+        # Cancelling this task doesn't stop the worker thread, so the slot is
+        # held until the call itself finishes, not until we stop waiting on it
+        future.add_done_callback(functools.partial(_release_viz_slot, asyncio.get_running_loop()))
+        response = await asyncio.wrap_future(future)
 
         # Check if task was cancelled while waiting
         if asyncio.current_task().cancelled():
@@ -186,28 +524,32 @@ async def _generate_visualization_background(
             for tool_call in choice.message.tool_calls:
                 tool_name = tool_call.function.name
                 try:
-                    arguments = json.loads(tool_call.function.arguments)
+                    arguments = _loads(tool_call.function.arguments)
                     result = execute_tool(tool_name, arguments)
                     tool_results.append({"tool": tool_name, "result": result})
-                    logger.info(f"Background viz: executed {tool_name}")
+                    logger.info("Background viz: executed %s", tool_name)
                 except json.JSONDecodeError as e:
-                    logger.error(f"Background viz: failed to parse args for {tool_name}: {e}")
+                    logger.error("Background viz: failed to parse args for %s: %s", tool_name, e)
 
         if not tool_results:
-            logger.warning(f"Background viz: no tool calls in response for '{description}'")
+            logger.warning("Background viz: no tool calls in response for '%s'", description)
+            return
+
+        if epoch != session_state.epoch:
+            logger.info("Background viz: dropping stale result for '%s' (mode changed)", description)
             return
 
         # Send tool results to frontend
         for tr in tool_results:
             try:
-                await websocket.send_text(json.dumps({
+                await session_state.send_to_browser(_dumps({
                     "type": "tool_result",
                     "tool": tr["tool"],
                     "result": tr["result"]
                 }))
-                logger.info(f"Background viz: sent {tr['tool']} result to frontend")
+                logger.info("Background viz: sent %s result to frontend", tr["tool"])
             except Exception as e:
-                logger.error(f"Background viz: failed to send to frontend: {e}")
+                logger.error("Background viz: failed to send to frontend: %s", e)
                 return
 
         # Build a summary for the voice model notification
@@ -221,21 +563,22 @@ async def _generate_visualization_background(
         summary = " ".join(summary_parts)
 
         # Queue notification for voice model
-        await _notify_voice_model(session_state, realtime_ws, summary)
+        await _notify_voice_model(session_state, summary)
 
     except asyncio.CancelledError:
-        logger.info(f"Background viz cancelled for '{description}'")
+        logger.info("Background viz cancelled for '%s'", description)
         raise
     except Exception as e:
-        logger.error(f"Background viz error for '{description}': {e}")
+        logger.error("Background viz error for '%s': %s", description, e)
     finally:
-        # Remove from pending
-        session_state.pending_visualizations.pop(vis_type, None)
+        # Remove from pending, unless a newer request of this type has
+        # already replaced this task
+        if session_state.pending_visualizations.get(vis_type) is asyncio.current_task():
+            del session_state.pending_visualizations[vis_type]
 
 
 async def _notify_voice_model(
     session_state: VoiceSessionState,
-    realtime_ws: Any,
     summary: str,
 ) -> None:
     """
@@ -257,13 +600,13 @@ async def _notify_voice_model(
         logger.info("Voice model busy - deferred visualization notification")
     else:
         # Send immediately
-        await _send_notification(realtime_ws, notification)
+        await _send_notification(session_state, notification)
 
 
-async def _send_notification(realtime_ws: Any, notification: dict) -> None:
+async def _send_notification(session_state: VoiceSessionState, notification: dict) -> None:
     """Send a notification to the voice model as a context injection."""
     try:
-        await realtime_ws.send(json.dumps({
+        await session_state.send_to_realtime(_dumps({
             "type": "conversation.item.create",
             "item": {
                 "type": "message",
@@ -274,12 +617,487 @@ async def _send_notification(realtime_ws: Any, notification: dict) -> None:
                 }]
             }
         }))
-        await realtime_ws.send(json.dumps({
-            "type": "response.create"
-        }))
-        logger.info(f"Sent visualization notification to voice model")
+        await session_state.send_to_realtime(RESP_CREATE)
+        logger.info("Sent visualization notification to voice model")
     except Exception as e:
-        logger.error(f"Failed to send notification to voice model: {e}")
+        logger.error("Failed to send notification to voice model: %s", e)
+
+
+async def _on_session_created(event: dict, session_state: VoiceSessionState) -> None:
+    """Log that the gpt-realtime session was created."""
+    logger.info("gpt-realtime session created")
+
+
+async def _on_session_updated(event: dict, session_state: VoiceSessionState) -> None:
+    """Log that the gpt-realtime session configuration was applied."""
+    logger.info("gpt-realtime session updated")
+
+
+async def _on_response_created(event: dict, session_state: VoiceSessionState) -> None:
+    """Mark the voice model as responding."""
+    session_state.model_is_responding = True
+
+
+async def _on_response_done(event: dict, session_state: VoiceSessionState) -> None:
+    """Mark the voice model idle and flush any deferred notifications."""
+    session_state.model_is_responding = False
+    session_state.finish_assistant_message()
+    session_state.flush_transcript()
+    # Process any deferred notifications as one merged notification, so the
+    # model answers once instead of queueing a response per visualization
+    if session_state.deferred_notifications:
+        summary = " ".join(n["summary"] for n in session_state.deferred_notifications)
+        session_state.deferred_notifications.clear()
+        await _send_notification(session_state, {"summary": summary})
+
+
+async def _on_speech_started(event: dict, session_state: VoiceSessionState) -> None:
+    """User started speaking - cancel the in-progress response immediately."""
+    await session_state.send_to_realtime(RESP_CANCEL)
+    # Drop assistant audio that hasn't reached the browser yet, but deliver
+    # the transcript text generated so far ahead of speech_started: the
+    # browser closes the assistant bubble on it, so later text would be orphaned
+    session_state.clear_audio_queue()
+    transcript = session_state.take_transcript()
+    if transcript is not None:
+        await session_state.send_to_browser(transcript)
+    logger.info("User interrupted - cancelled response")
+    await session_state.send_to_browser(SPEECH_STARTED)
+
+
+async def _on_speech_stopped(event: dict, session_state: VoiceSessionState) -> None:
+    """User stopped speaking."""
+    await session_state.send_to_browser(SPEECH_STOPPED)
+
+
+async def _on_transcription_completed(event: dict, session_state: VoiceSessionState) -> None:
+    """User's speech transcribed - forward it and check for a mode switch."""
+    transcript = event.get("transcript", "")
+    if transcript:
+        # Track transcript for Chat API context
+        session_state.add_transcript("user", transcript)
+
+        await session_state.send_to_browser(_dumps({
+            "type": "transcript",
+            "role": "user",
+            "text": transcript
+        }))
+
+        # Quick check if this might be a mode switch (cancel early!)
+        might_be_mode_switch = _WAKE_RE.search(transcript) is not None
+
+        if might_be_mode_switch:
+            # Cancel any in-flight response IMMEDIATELY before LLM call
+            await session_state.send_to_realtime(RESP_CANCEL)
+            logger.info("Cancelled in-flight response (possible mode switch)")
+
+            # Cancel pending visualizations on mode switch
+            session_state.cancel_all_pending()
+
+            # Send loading indicator to frontend
+            await session_state.send_to_browser(MODE_GENERATING)
+
+        # Check for mode switch in voice transcript
+        new_mode = await detect_mode_switch(transcript, None)  # Don't pass websocket to avoid double loading
+        if new_mode:
+            logger.info("Voice mode switch detected: %s", new_mode.name)
+            set_current_mode(new_mode.id)
+
+            # Cancel any pending visualizations
+            session_state.cancel_all_pending()
+            # Clear transcript history for new mode
+            session_state.clear_transcript()
+
+            # Generate persona for new mode
+            persona = generate_persona(new_mode.id, get_session_seed())
+            logger.info("Generated persona for voice: %s", persona.get('name', 'Unknown'))
+
+            mode_switch_msg = _dumps({
+                "type": "mode_switch",
+                "payload": {
+                    "mode": get_mode_payload(new_mode),
+                    "persona": persona
+                }
+            })
+            new_system_prompt = build_voice_system_prompt(build_system_prompt(new_mode, persona))
+            session_update_msg = _SESSION_UPDATE_PREFIX + _dumps(new_system_prompt) + _SESSION_UPDATE_SUFFIX
+
+            # Send mode_switch to browser and update the gpt-realtime session with
+            # new instructions - separate sender tasks put them on the wire concurrently
+            await session_state.send_to_browser(mode_switch_msg)
+            await session_state.send_to_realtime(session_update_msg)
+            logger.info("Updated gpt-realtime session with new mode instructions")
+
+            # Trigger a new response with a welcome message context
+            # (must follow the session.update, and precede response.create)
+            await session_state.send_to_realtime(_dumps({
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "message",
+                    "role": "user",
+                    "content": [{
+                        "type": "input_text",
+                        "text": f"The user just switched to {new_mode.name} mode. Greet them warmly as their new {new_mode.name} assistant. Be brief."
+                    }]
+                }
+            }))
+            await session_state.send_to_realtime(RESP_CREATE)
+            logger.info("Triggered welcome response for new mode")
+        elif might_be_mode_switch:
+            # We showed loading but it wasn't a mode switch - cancel it
+            await session_state.send_to_browser(MODE_GENERATING_CANCEL)
+
+
+async def _on_audio_delta(event: dict, session_state: VoiceSessionState) -> None:
+    """Queue an assistant audio chunk for the audio flusher."""
+    audio_data = event.get("delta", "")
+    if audio_data:
+        # Batched by _audio_flusher to avoid one frame per delta
+        session_state.push_audio(audio_data)
+
+
+async def _on_audio_done(event: dict, session_state: VoiceSessionState) -> None:
+    """Assistant audio response complete - flush any batched transcript text."""
+    logger.info("Audio response complete")
+    session_state.flush_transcript()
+
+
+async def _on_transcript_delta(event: dict, session_state: VoiceSessionState) -> None:
+    """Track and forward an assistant transcript chunk."""
+    transcript = event.get("delta", "")
+    if transcript:
+        # Track assistant transcript for Chat API context (accumulate deltas)
+        session_state.append_assistant_delta(transcript)
+
+        # Batched by _transcript_flusher to avoid one frame per delta
+        session_state.transcript_queue.put_nowait(transcript)
+
+
+async def _on_function_call_arguments_done(event: dict, session_state: VoiceSessionState) -> None:
+    """Lightweight tool call completed (request_visualization)."""
+    call_id = event.get("call_id", "")
+    name = event.get("name", "")
+    arguments_str = event.get("arguments", "{}")
+
+    logger.info("Tool call: %s with args: %s", name, arguments_str[:200])
+
+    try:
+        arguments = _loads(arguments_str)
+
+        if name == "request_visualization":
+            vis_type = arguments.get("vis_type", "chart")
+            description = arguments.get("description", "")
+
+            # 1. Immediately acknowledge the tool call
+            ack_output = _dumps({
+                "status": "generating",
+                "message": f"Generating {vis_type} for: {description}"
+            })
+            await session_state.send_to_realtime(_dumps({
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "function_call_output",
+                    "call_id": call_id,
+                    "output": ack_output
+                }
+            }))
+
+            # 2. Resume voice immediately
+            await session_state.send_to_realtime(RESP_CREATE)
+
+            # 3. Send loading indicator to frontend
+            await session_state.send_to_browser(_dumps({
+                "type": "visualization_generating",
+                "vis_type": vis_type,
+                "description": description
+            }))
+
+            # 4. Cancel previous pending visualization of same type
+            if vis_type in session_state.pending_visualizations:
+                old_task = session_state.pending_visualizations[vis_type]
+                if not old_task.done():
+                    old_task.cancel()
+                    logger.info("Cancelled previous pending %s visualization", vis_type)
+
+            # 5. Launch background task
+            task = asyncio.create_task(
+                _generate_visualization_background(session_state, vis_type, description, session_state.epoch)
+            )
+            session_state.pending_visualizations[vis_type] = task
+
+            logger.info("Launched background %s generation for: %s", vis_type, description)
+        else:
+            # Fallback: handle any other tool calls directly, off the event loop
+            # so a slow tool can't stall the relay
+            result = await asyncio.to_thread(execute_tool, name, arguments)
+
+            await session_state.send_to_browser(_dumps({
+                "type": "tool_result",
+                "tool": name,
+                "result": result
+            }))
+
+            await session_state.send_to_realtime(_dumps({
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "function_call_output",
+                    "call_id": call_id,
+                    "output": _dumps(result)
+                }
+            }))
+
+            await session_state.send_to_realtime(RESP_CREATE)
+
+            logger.info("Tool %s executed and result sent", name)
+
+    except json.JSONDecodeError as e:
+        logger.error("Failed to parse tool arguments: %s", e)
+
+
+async def _on_error(event: dict, session_state: VoiceSessionState) -> None:
+    """Forward an error reported by gpt-realtime to the browser."""
+    error_info = event.get("error", {})
+    error_message = error_info.get("message", "Unknown error")
+    logger.error("gpt-realtime error: %s", error_message)
+    await session_state.send_to_browser(_error_frame(error_message))
+
+
+# Event type -> handler. High-frequency streaming events come first.
+REALTIME_EVENT_HANDLERS: dict[str, Callable[[dict, VoiceSessionState], Awaitable[None]]] = {
+    "response.audio.delta": _on_audio_delta,
+    "response.audio_transcript.delta": _on_transcript_delta,
+    "response.created": _on_response_created,
+    "response.done": _on_response_done,
+    "response.audio.done": _on_audio_done,
+    "input_audio_buffer.speech_started": _on_speech_started,
+    "input_audio_buffer.speech_stopped": _on_speech_stopped,
+    "conversation.item.input_audio_transcription.completed": _on_transcription_completed,
+    "response.function_call_arguments.done": _on_function_call_arguments_done,
+    "session.created": _on_session_created,
+    "session.updated": _on_session_updated,
+    "error": _on_error,
+}
+
+
+# gpt-realtime serializes "type" as the first key of every server event
+_EVENT_TYPE_PREFIX = '{"type":"'
+
+
+def _peek_event_type(message: str | bytes) -> str | None:
+    """
+    Read the event type from a raw gpt-realtime frame without parsing it.
+
+    Returns None when the frame doesn't lead with "type", in which case the
+    caller must fall back to a full parse.
+    """
+    if not isinstance(message, str) or not message.startswith(_EVENT_TYPE_PREFIX):
+        return None
+    end = message.find('"', len(_EVENT_TYPE_PREFIX))
+    if end == -1:
+        return None
+    return message[len(_EVENT_TYPE_PREFIX):end]
+
+
+def _frame_sender(websocket: WebSocket, kind: str) -> Callable[[Any], Awaitable[None]]:
+    """
+    Return a send function for one browser frame kind ("text" or "bytes").
+
+    Reuses a single ASGI message dict instead of allocating one per frame as
+    send_text()/send_bytes() do. Goes through WebSocket.send so Starlette's
+    state checks and disconnect handling still apply. Only for a single
+    sequential sender - the dict is mutated on every call.
+    """
+    message = {"type": "websocket.send", kind: None}
+    send = websocket.send
+
+    async def send_frame(payload: Any) -> None:
+        message[kind] = payload
+        await send(message)
+
+    return send_frame
+
+
+async def _queue_sender(queue: asyncio.Queue[str], send: Callable[[str], Awaitable[None]]) -> None:
+    """Drain an outbound queue onto its socket, decoupling producers from socket I/O."""
+    while True:
+        await send(await queue.get())
+
+
+async def _browser_sender(queue: asyncio.Queue[str], websocket: WebSocket) -> None:
+    """
+    Drain the browser control queue, corking queued messages into shared frames.
+
+    Everything already queued at wakeup is joined with BROWSER_FRAME_SEPARATOR
+    into as few text frames as BROWSER_FRAME_MAX_CHARS allows; no timer is
+    armed, so a lone message still goes out immediately.
+    """
+    send_text = _frame_sender(websocket, "text")
+    while True:
+        batch = [await queue.get()]
+        size = len(batch[0])
+        while not queue.empty():
+            message = queue.get_nowait()
+            if size + len(message) > BROWSER_FRAME_MAX_CHARS:
+                await send_text(BROWSER_FRAME_SEPARATOR.join(batch))
+                batch = []
+                size = 0
+            batch.append(message)
+            size += len(message)
+        await send_text(BROWSER_FRAME_SEPARATOR.join(batch))
+
+
+async def _iter_browser_frames(websocket: WebSocket) -> AsyncIterator[str | bytes]:
+    """
+    Yield browser frame payloads until the browser disconnects.
+
+    Like Starlette's iter_text()/iter_bytes(), but yields whichever payload
+    type each frame carries, and ends on disconnect instead of raising.
+    """
+    while True:
+        raw = await websocket.receive()
+        if raw["type"] == "websocket.disconnect":
+            logger.info("Browser disconnected")
+            return
+        payload = raw.get("bytes")
+        yield payload if payload is not None else raw.get("text", "")
+
+
+async def _audio_flusher(session_state: VoiceSessionState, websocket: WebSocket) -> None:
+    """
+    Forward queued assistant audio to the browser in batches.
+
+    Waits for the first chunk, gives closely following deltas a short window
+    to arrive, then drains the queue (bounded by the batch caps) into one
+    binary frame of raw PCM16 instead of one JSON frame per delta.
+    """
+    mailbox = session_state.audio_out
+    send_bytes = _frame_sender(websocket, "bytes")
+    while True:
+        await mailbox.wait()
+        await asyncio.sleep(AUDIO_BATCH_WINDOW_SECONDS)
+        chunks = []
+        size = 0
+        while mailbox and len(chunks) < AUDIO_BATCH_MAX_CHUNKS and size < AUDIO_BATCH_MAX_BYTES:
+            chunk = mailbox.popleft()
+            chunks.append(chunk)
+            size += len(chunk)
+        if not chunks:
+            continue  # Cleared by an interruption during the batch window
+        # gpt-realtime sends base64; the browser leg carries raw bytes (no
+        # base64 inflation or JSON escaping) as a binary frame
+        await send_bytes(b"".join(base64.b64decode(chunk) for chunk in chunks))
+
+
+async def _mic_sender(session_state: VoiceSessionState, realtime_ws: Any) -> None:
+    """
+    Forward queued microphone audio to gpt-realtime.
+
+    Frames that piled up while the previous send was in flight go out as a
+    single input_audio_buffer.append.
+    """
+    mailbox = session_state.mic_audio
+    while True:
+        await mailbox.wait()
+        # gpt-realtime still expects base64 inside JSON, so encode only here
+        pcm = b"".join(mailbox.drain())
+        # Already UTF-8 (ASCII) bytes; text=True sends them as a text frame as-is
+        await realtime_ws.send(AUDIO_APPEND_PREFIX + base64.b64encode(pcm) + AUDIO_APPEND_SUFFIX, text=True)
+
+
+async def _transcript_flusher(session_state: VoiceSessionState) -> None:
+    """
+    Forward queued assistant transcript deltas to the browser in batches.
+
+    Waits for the first delta, then collects more until the batch window
+    elapses or the end of the response's audio requests an early flush, and
+    sends the concatenated text as a single transcript message.
+    """
+    queue = session_state.transcript_queue
+    flush_now = session_state.transcript_flush
+    while True:
+        session_state.transcript_batch.append(await queue.get())
+        try:
+            await asyncio.wait_for(flush_now.wait(), TRANSCRIPT_BATCH_WINDOW_SECONDS)
+        except TimeoutError:
+            pass
+        flush_now.clear()
+        # None if an interruption already sent the batch during the window
+        transcript = session_state.take_transcript()
+        if transcript is not None:
+            await session_state.send_to_browser(transcript)
+
+
+async def _send_final(websocket: WebSocket, message: str) -> None:
+    """Best-effort send of a teardown notice, bounded by BROWSER_FINAL_SEND_TIMEOUT_SECONDS."""
+    try:
+        await asyncio.wait_for(websocket.send_text(message), BROWSER_FINAL_SEND_TIMEOUT_SECONDS)
+    except Exception:
+        pass  # Browser may already be disconnected or not draining
+
+
+async def _notify_disconnected(websocket: WebSocket) -> None:
+    """Tell the browser the voice session has ended."""
+    await _send_final(websocket, STATUS_DISCONNECTED)
+
+
+async def _connect_realtime(websocket: WebSocket, token: str) -> Any:
+    """
+    Open the gpt-realtime connection, retrying throttled handshakes.
+
+    While waiting to retry, the browser is told the session is still
+    connecting, so its socket stays open across the upstream blip.
+    """
+    for attempt in range(REALTIME_CONNECT_RETRIES + 1):
+        try:
+            # Audio payloads are base64 of near-incompressible PCM, so per-message
+            # deflate would only burn CPU on every frame; keepalive pings stay on.
+            return await ws_connect(
+                REALTIME_URI,
+                additional_headers={
+                    "Authorization": f"Bearer {token}"
+                },
+                compression=None,
+                max_size=REALTIME_MAX_MESSAGE_BYTES,
+                write_limit=REALTIME_WRITE_LIMIT_BYTES,
+                ping_interval=20,
+                ping_timeout=20,
+            )
+        except websockets.exceptions.InvalidStatus as e:
+            status_code = e.response.status_code
+            if status_code not in REALTIME_RETRY_STATUSES or attempt == REALTIME_CONNECT_RETRIES:
+                raise
+            delay = REALTIME_CONNECT_BACKOFF_SECONDS * 2 ** attempt
+            logger.warning("gpt-realtime handshake returned %d, retrying in %.2fs", status_code, delay)
+            await websocket.send_text(_dumps({"type": "status", "status": "connecting", "retry_in": delay}))
+            await asyncio.sleep(delay)
+
+
+class _RelayFinished(Exception):
+    """Raised when a relay task returns normally, so its TaskGroup cancels the siblings."""
+
+
+async def _raise_on_return(coro: Awaitable[None]) -> None:
+    """Await coro, then signal its normal completion to the TaskGroup."""
+    await coro
+    raise _RelayFinished
+
+
+async def _run_until_first_exit(*coros: Awaitable[None]) -> None:
+    """
+    Run coroutines in a TaskGroup until the first one returns or fails.
+
+    The remaining tasks are cancelled and awaited by the TaskGroup. A normal
+    return ends the session quietly; the first real error is re-raised unwrapped
+    so callers can keep handling plain exceptions.
+    """
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for coro in coros:
+                tg.create_task(_raise_on_return(coro))
+    except ExceptionGroup as eg:
+        _, errors = eg.split(_RelayFinished)
+        if errors is not None:
+            raise errors.exceptions[0]
 
 
 async def handle_voice_session(websocket: WebSocket) -> None:
@@ -289,47 +1107,36 @@ async def handle_voice_session(websocket: WebSocket) -> None:
     Creates a relay between the browser WebSocket and gpt-realtime API.
 
     Browser WebSocket messages (incoming):
-    - {"type": "audio", "data": "<base64-pcm16>"}
+    - binary frame: raw PCM16 microphone audio
     - {"type": "mute", "muted": true/false}
     - {"type": "stop"}
 
     Messages sent to browser (outgoing):
-    - {"type": "status", "status": "connected"|"disconnected"|"error"}
+    - {"type": "status", "status": "connecting"|"connected"|"disconnected"|"error"}
+      ("connecting" carries "retry_in" seconds while a throttled handshake is retried)
     - {"type": "speech_started"}
     - {"type": "speech_stopped"}
-    - {"type": "audio", "data": "<base64-pcm16>"}
+    - binary frame: raw PCM16 assistant audio (all other messages are JSON text;
+      one text frame may carry several, separated by "\x1e")
     - {"type": "transcript", "role": "user"|"assistant", "text": "..."}
     - {"type": "tool_result", "tool": "...", "result": {...}}
     - {"type": "visualization_generating", "vis_type": "chart"|"metrics"}
     - {"type": "error", "error": "..."}
     """
+    # The relay is pure event-loop scheduling across two sockets; it runs on
+    # uvloop when uvicorn[standard] selects it (see the startup "Event loop" log).
     realtime_ws = None
     muted = False
     session_state = VoiceSessionState()
 
     try:
-        # Get Azure credential and token
-        credential = get_azure_credential()
-        token = credential.get_token("https://cognitiveservices.azure.com/.default")
-
-        # Build gpt-realtime WebSocket URI
-        # Format: wss://{host}/openai/realtime?api-version={version}&deployment={deployment}
-        # Extract host from endpoint (remove protocol and /models path)
-        endpoint_host = AZURE_ENDPOINT.replace("https://", "").replace("http://", "").rstrip("/")
-        # Remove /models suffix if present (chat endpoint has it, realtime doesn't use it)
-        if endpoint_host.endswith("/models"):
-            endpoint_host = endpoint_host[:-7]
-        realtime_uri = f"wss://{endpoint_host}/openai/realtime?api-version={REALTIME_API_VERSION}&deployment={REALTIME_DEPLOYMENT}"
+        # Get a token - cached across sessions so most openings skip the AAD roundtrip
+        token = await asyncio.to_thread(get_cached_token, "https://cognitiveservices.azure.com/.default")
 
-        logger.info(f"Connecting to gpt-realtime at: {realtime_uri}")
+        logger.info("Connecting to gpt-realtime at: %s", REALTIME_URI)
 
         # Connect to gpt-realtime with authorization header
-        realtime_ws = await websockets.connect(
-            realtime_uri,
-            additional_headers={
-                "Authorization": f"Bearer {token.token}"
-            }
-        )
+        realtime_ws = await _connect_realtime(websocket, token.token)
 
         logger.info("Connected to gpt-realtime API")
 
@@ -354,374 +1161,100 @@ async def handle_voice_session(websocket: WebSocket) -> None:
                     "prefix_padding_ms": 300,
                     "silence_duration_ms": 500
                 },
-                "tools": build_realtime_tools(),
+                "tools": _REALTIME_TOOLS,
                 "instructions": system_prompt
             }
         }
 
-        await realtime_ws.send(json.dumps(session_config))
+        await realtime_ws.send(_dumps(session_config))
         logger.info("Sent session configuration to gpt-realtime")
 
         # Notify browser of successful connection
-        await websocket.send_text(json.dumps({
-            "type": "status",
-            "status": "connected"
-        }))
+        await websocket.send_text(STATUS_CONNECTED)
 
         # Create tasks for bidirectional relay
         async def browser_to_realtime():
             """Forward browser audio to gpt-realtime."""
             nonlocal muted
-            try:
-                while True:
-                    data = await websocket.receive_text()
-                    message = json.loads(data)
-                    msg_type = message.get("type")
-
-                    if msg_type == "audio":
-                        if not muted:
-                            # Forward audio to gpt-realtime
-                            await realtime_ws.send(json.dumps({
-                                "type": "input_audio_buffer.append",
-                                "audio": message.get("data", "")
-                            }))
-
-                    elif msg_type == "mute":
-                        muted = message.get("muted", False)
-                        logger.info(f"Mute state changed: {muted}")
-
-                    elif msg_type == "stop":
-                        logger.info("Stop requested by browser")
-                        break
+            async for payload in _iter_browser_frames(websocket):
+                if isinstance(payload, bytes):
+                    # Fast path: binary frames are raw PCM16 mic audio, no JSON to parse
+                    if not muted:
+                        session_state.mic_audio.put(payload)
+                    continue
 
-            except Exception as e:
-                logger.error(f"Browser to realtime relay error: {e}")
-                raise
+                message = _loads(payload)
+                msg_type = message.get("type")
+
+                if msg_type == "mute":
+                    muted = message.get("muted", False)
+                    logger.info("Mute state changed: %s", muted)
+
+                elif msg_type == "stop":
+                    logger.info("Stop requested by browser")
+                    break
 
         async def realtime_to_browser():
             """Forward gpt-realtime events to browser."""
             try:
                 async for message in realtime_ws:
-                    event = json.loads(message)
+                    # Most event types have no handler; skip them before paying for a parse
+                    peeked_type = _peek_event_type(message)
+                    if peeked_type is not None and peeked_type not in REALTIME_EVENT_HANDLERS:
+                        logger.debug("gpt-realtime event: %s", peeked_type)
+                        continue
+
+                    event = _loads(message)
                     event_type = event.get("type", "")
 
-                    logger.debug(f"gpt-realtime event: {event_type}")
-
-                    if event_type == "session.created":
-                        logger.info("gpt-realtime session created")
-
-                    elif event_type == "session.updated":
-                        logger.info("gpt-realtime session updated")
-
-                    elif event_type == "response.created":
-                        session_state.model_is_responding = True
-
-                    elif event_type == "response.done":
-                        session_state.model_is_responding = False
-                        # Process any deferred notifications
-                        if session_state.deferred_notifications:
-                            notifications = session_state.deferred_notifications[:]
-                            session_state.deferred_notifications.clear()
-                            for notification in notifications:
-                                await _send_notification(realtime_ws, notification)
-
-                    elif event_type == "input_audio_buffer.speech_started":
-                        # User started speaking - IMMEDIATELY cancel any in-progress response
-                        await realtime_ws.send(json.dumps({
-                            "type": "response.cancel"
-                        }))
-                        logger.info("User interrupted - cancelled response")
-                        await websocket.send_text(json.dumps({
-                            "type": "speech_started"
-                        }))
-
-                    elif event_type == "input_audio_buffer.speech_stopped":
-                        # User stopped speaking
-                        await websocket.send_text(json.dumps({
-                            "type": "speech_stopped"
-                        }))
-
-                    elif event_type == "conversation.item.input_audio_transcription.completed":
-                        # User's speech transcribed
-                        transcript = event.get("transcript", "")
-                        if transcript:
-                            # Track transcript for Chat API context
-                            session_state.add_transcript("user", transcript)
-
-                            await websocket.send_text(json.dumps({
-                                "type": "transcript",
-                                "role": "user",
-                                "text": transcript
-                            }))
-
-                            # Quick check if this might be a mode switch (cancel early!)
-                            transcript_lower = transcript.lower()
-                            might_be_mode_switch = "presto" in transcript_lower
-
-                            if might_be_mode_switch:
-                                # Cancel any in-flight response IMMEDIATELY before LLM call
-                                await realtime_ws.send(json.dumps({
-                                    "type": "response.cancel"
-                                }))
-                                logger.info("Cancelled in-flight response (possible mode switch)")
-
-                                # Cancel pending visualizations on mode switch
-                                session_state.cancel_all_pending()
-
-                                # Send loading indicator to frontend
-                                await websocket.send_text(json.dumps({
-                                    "type": "mode_generating",
-                                    "payload": {"industry": "new mode"}
-                                }))
-
-                            # Check for mode switch in voice transcript
-                            new_mode = await detect_mode_switch(transcript, None)  # Don't pass websocket to avoid double loading
-                            if new_mode:
-                                logger.info(f"Voice mode switch detected: {new_mode.name}")
-                                set_current_mode(new_mode.id)
-
-                                # Cancel any pending visualizations
-                                session_state.cancel_all_pending()
-                                # Clear transcript history for new mode
-                                session_state.transcript_history.clear()
-
-                                # Generate persona for new mode
-                                persona = generate_persona(new_mode.id, get_session_seed())
-                                logger.info(f"Generated persona for voice: {persona.get('name', 'Unknown')}")
-
-                                # Send mode_switch to browser
-                                await websocket.send_text(json.dumps({
-                                    "type": "mode_switch",
-                                    "payload": {
-                                        "mode": {
-                                            "id": new_mode.id,
-                                            "name": new_mode.name,
-                                            "company_name": new_mode.company_name,
-                                            "tagline": new_mode.tagline,
-                                            "theme": new_mode.theme.model_dump(),
-                                            "tabs": [tab.model_dump() for tab in new_mode.tabs],
-                                            "defaultMetrics": [m.model_dump() for m in new_mode.default_metrics],
-                                            "background_image": new_mode.background_image,
-                                            "hero_image": new_mode.hero_image,
-                                            "chat_image": new_mode.chat_image,
-                                        },
-                                        "persona": persona
-                                    }
-                                }))
-
-                                # Update gpt-realtime session with new instructions
-                                new_system_prompt = build_voice_system_prompt(build_system_prompt(new_mode, persona))
-                                await realtime_ws.send(json.dumps({
-                                    "type": "session.update",
-                                    "session": {
-                                        "tools": build_realtime_tools(),
-                                        "instructions": new_system_prompt
-                                    }
-                                }))
-                                logger.info("Updated gpt-realtime session with new mode instructions")
-
-                                # Trigger a new response with a welcome message context
-                                await realtime_ws.send(json.dumps({
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "message",
-                                        "role": "user",
-                                        "content": [{
-                                            "type": "input_text",
-                                            "text": f"The user just switched to {new_mode.name} mode. Greet them warmly as their new {new_mode.name} assistant. Be brief."
-                                        }]
-                                    }
-                                }))
-                                await realtime_ws.send(json.dumps({
-                                    "type": "response.create"
-                                }))
-                                logger.info("Triggered welcome response for new mode")
-                            elif might_be_mode_switch:
-                                # We showed loading but it wasn't a mode switch - cancel it
-                                await websocket.send_text(json.dumps({
-                                    "type": "mode_generating_cancel",
-                                    "payload": {}
-                                }))
-
-                    elif event_type == "response.audio.delta":
-                        # Audio chunk from assistant
-                        audio_data = event.get("delta", "")
-                        if audio_data:
-                            await websocket.send_text(json.dumps({
-                                "type": "audio",
-                                "data": audio_data
-                            }))
-
-                    elif event_type == "response.audio.done":
-                        # Audio response complete
-                        logger.info("Audio response complete")
-
-                    elif event_type == "response.audio_transcript.delta":
-                        # Assistant transcript chunk
-                        transcript = event.get("delta", "")
-                        if transcript:
-                            # Track assistant transcript for Chat API context (accumulate deltas)
-                            session_state.append_assistant_delta(transcript)
-
-                            await websocket.send_text(json.dumps({
-                                "type": "transcript",
-                                "role": "assistant",
-                                "text": transcript
-                            }))
-
-                    elif event_type == "response.function_call_arguments.done":
-                        # Lightweight tool call completed (request_visualization)
-                        call_id = event.get("call_id", "")
-                        name = event.get("name", "")
-                        arguments_str = event.get("arguments", "{}")
-
-                        logger.info(f"Tool call: {name} with args: {arguments_str[:200]}")
-
-                        try:
-                            arguments = json.loads(arguments_str)
-
-                            if name == "request_visualization":
-                                vis_type = arguments.get("vis_type", "chart")
-                                description = arguments.get("description", "")
-
-                                # 1. Immediately acknowledge the tool call
-                                ack_output = json.dumps({
-                                    "status": "generating",
-                                    "message": f"Generating {vis_type} for: {description}"
-                                })
-                                await realtime_ws.send(json.dumps({
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "function_call_output",
-                                        "call_id": call_id,
-                                        "output": ack_output
-                                    }
-                                }))
-
-                                # 2. Resume voice immediately
-                                await realtime_ws.send(json.dumps({
-                                    "type": "response.create"
-                                }))
-
-                                # 3. Send loading indicator to frontend
-                                await websocket.send_text(json.dumps({
-                                    "type": "visualization_generating",
-                                    "vis_type": vis_type,
-                                    "description": description
-                                }))
-
-                                # 4. Cancel previous pending visualization of same type
-                                if vis_type in session_state.pending_visualizations:
-                                    old_task = session_state.pending_visualizations[vis_type]
-                                    if not old_task.done():
-                                        old_task.cancel()
-                                        logger.info(f"Cancelled previous pending {vis_type} visualization")
-
-                                # 5. Launch background task
-                                task = asyncio.create_task(
-                                    _generate_visualization_background(
-                                        session_state, vis_type, description,
-                                        websocket, realtime_ws
-                                    )
-                                )
-                                session_state.pending_visualizations[vis_type] = task
-
-                                logger.info(f"Launched background {vis_type} generation for: {description}")
-                            else:
-                                # Fallback: handle any other tool calls directly
-                                result = execute_tool(name, arguments)
-
-                                await websocket.send_text(json.dumps({
-                                    "type": "tool_result",
-                                    "tool": name,
-                                    "result": result
-                                }))
-
-                                await realtime_ws.send(json.dumps({
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "function_call_output",
-                                        "call_id": call_id,
-                                        "output": json.dumps(result)
-                                    }
-                                }))
-
-                                await realtime_ws.send(json.dumps({
-                                    "type": "response.create"
-                                }))
-
-                                logger.info(f"Tool {name} executed and result sent")
-
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Failed to parse tool arguments: {e}")
-
-                    elif event_type == "error":
-                        # Error from gpt-realtime
-                        error_info = event.get("error", {})
-                        error_message = error_info.get("message", "Unknown error")
-                        logger.error(f"gpt-realtime error: {error_message}")
-                        await websocket.send_text(json.dumps({
-                            "type": "error",
-                            "error": error_message
-                        }))
+                    logger.debug("gpt-realtime event: %s", event_type)
+
+                    handler = REALTIME_EVENT_HANDLERS.get(event_type)
+                    if handler:
+                        await handler(event, session_state)
 
             except websockets.exceptions.ConnectionClosed:
                 logger.info("gpt-realtime connection closed")
             except Exception as e:
-                logger.error(f"Realtime to browser relay error: {e}")
+                logger.error("Realtime to browser relay error: %s", e)
                 raise
 
-        # Run both relay tasks concurrently
-        browser_task = asyncio.create_task(browser_to_realtime())
-        realtime_task = asyncio.create_task(realtime_to_browser())
-
-        # Wait for either task to complete (or fail)
-        done, pending = await asyncio.wait(
-            [browser_task, realtime_task],
-            return_when=asyncio.FIRST_COMPLETED
+        # Run both relay tasks plus the outbound senders until the first one exits
+        await _run_until_first_exit(
+            browser_to_realtime(),
+            realtime_to_browser(),
+            _audio_flusher(session_state, websocket),
+            _mic_sender(session_state, realtime_ws),
+            _transcript_flusher(session_state),
+            _browser_sender(session_state.browser_queue, websocket),
+            _queue_sender(session_state.realtime_queue, realtime_ws.send),
         )
 
-        # Cancel remaining tasks
-        for task in pending:
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
-
-        # Check for errors in completed tasks
-        for task in done:
-            if task.exception():
-                raise task.exception()
-
-    except websockets.exceptions.InvalidStatusCode as e:
-        logger.error(f"Failed to connect to gpt-realtime: {e}")
-        await websocket.send_text(json.dumps({
-            "type": "error",
-            "error": f"Failed to connect to voice service: {e}"
-        }))
+    except websockets.exceptions.InvalidStatus as e:
+        logger.error("Failed to connect to gpt-realtime: %s", e)
+        await _send_final(websocket, _error_frame(f"Failed to connect to voice service: {e}"))
     except Exception as e:
-        logger.error(f"Voice session error: {e}")
-        await websocket.send_text(json.dumps({
-            "type": "error",
-            "error": str(e)
-        }))
+        logger.error("Voice session error: %s", e)
+        await _send_final(websocket, _error_frame(str(e)))
     finally:
-        # Cancel all pending background tasks
-        session_state.cancel_all_pending()
+        # Cancel all pending background tasks; they are reaped in the same
+        # gather as the socket cleanup rather than awaited one by one
+        cancelled = session_state.cancel_all_pending()
 
-        # Clean up gpt-realtime connection
+        # Notify browser of disconnection and clean up the gpt-realtime
+        # connection concurrently - they are independent sockets
+        closers = [_notify_disconnected(websocket), *cancelled]
         if realtime_ws:
-            await realtime_ws.close()
-            logger.info("Closed gpt-realtime connection")
-
-        # Notify browser of disconnection
+            closers.append(realtime_ws.close())
+        cleanup = asyncio.gather(*closers, return_exceptions=True)
         try:
-            await websocket.send_text(json.dumps({
-                "type": "status",
-                "status": "disconnected"
-            }))
-        except Exception:
-            pass  # Browser may already be disconnected
+            await asyncio.shield(cleanup)
+        except asyncio.CancelledError:
+            # The ASGI task was cancelled mid-teardown (client abort): finish
+            # closing so the gpt-realtime connection isn't leaked, then propagate
+            await cleanup
+            raise
+        if realtime_ws:
+            logger.info("Closed gpt-realtime connection")
 
         logger.info("Voice session ended")
@@ -1,5 +1,5 @@
 import { useState, useRef, useCallback, useEffect } from 'react'
-import { pcm16ToFloat32, float32ToPcm16Base64, VOICE_SAMPLE_RATE } from '../lib/audioUtils'
+import { pcm16ToFloat32, float32ToPcm16, VOICE_SAMPLE_RATE } from '../lib/audioUtils'
 
 const VOICE_WS_URL = 'ws://localhost:8000/voice'
 const MAX_RECONNECT_DELAY = 30000
@@ -156,92 +156,96 @@ export function useVoice(options: UseVoiceOptions = {}): UseVoiceReturn {
    * Handle incoming WebSocket messages
    */
   const handleMessage = useCallback((event: MessageEvent) => {
-    try {
-      const message = JSON.parse(event.data) as VoiceMessage
-
-      switch (message.type) {
-        case 'status':
-          if (message.status === 'connected') {
-            setStatus('connected')
-            reconnectDelayRef.current = INITIAL_RECONNECT_DELAY
-          } else if (message.status === 'error') {
-            setStatus('error')
-            onErrorRef.current?.(message.error as string || 'Connection error')
-          }
-          break
-
-        case 'speech_started':
-          setIsListening(true)
-          // Stop assistant audio playback when user starts speaking (interruption)
-          stopPlayback()
-          onInterruptRef.current?.()
-          onUserSpeechStartRef.current?.()
-          break
-
-        case 'speech_stopped':
-          setIsListening(false)
-          onUserSpeechEndRef.current?.()
-          break
-
-        case 'audio': {
-          // Queue audio for playback
-          const base64 = message.data as string
-          const float32 = pcm16ToFloat32(base64)
-          audioQueueRef.current.push(float32)
-          playNextAudioChunk()
-
-          // Set speaking state with timeout to detect end of speech
-          setIsSpeaking(true)
-          if (speakingTimeoutRef.current) {
-            clearTimeout(speakingTimeoutRef.current)
-          }
-          speakingTimeoutRef.current = setTimeout(() => {
-            setIsSpeaking(false)
-          }, 500) // Consider stopped speaking after 500ms of no audio
-          break
-        }
-
-        case 'transcript':
-          onTranscriptRef.current?.(
-            message.role as 'user' | 'assistant',
-            message.text as string
-          )
-          break
-
-        case 'tool_result':
-          onToolResultRef.current?.(
-            message.tool as string,
-            message.result as Record<string, unknown>
-          )
-          break
-
-        case 'mode_switch':
-          onModeSwitchRef.current?.(message.payload as Record<string, unknown>)
-          break
-
-        case 'mode_generating':
-          onModeGeneratingRef.current?.((message.payload as { industry: string }).industry)
-          break
-
-        case 'visualization_generating':
-          // Loading indicator for async visualization generation
-          onToolResultRef.current?.(
-            '_generating',
-            { vis_type: message.vis_type as string, description: message.description as string }
-          )
-          break
-
-        case 'mode_generating_cancel':
-          // Signal to clear the mode generating indicator (pass empty string)
-          onModeGeneratingRef.current?.('')
-          break
+    // Binary frames carry raw PCM16 assistant audio; everything else is JSON
+    if (event.data instanceof ArrayBuffer) {
+      audioQueueRef.current.push(pcm16ToFloat32(event.data))
+      playNextAudioChunk()
+
+      // Set speaking state with timeout to detect end of speech
+      setIsSpeaking(true)
+      if (speakingTimeoutRef.current) {
+        clearTimeout(speakingTimeoutRef.current)
+      }
+      speakingTimeoutRef.current = setTimeout(() => {
+        setIsSpeaking(false)
+      }, 500) // Consider stopped speaking after 500ms of no audio
+      return
+    }
 
-        case 'error':
-          onErrorRef.current?.(message.error as string)
-          break
+    // Text frames may carry several JSON messages separated by RS (\x1e)
+    for (const part of (event.data as string).split('\x1e')) {
+      try {
+        const message = JSON.parse(part) as VoiceMessage
+
+        switch (message.type) {
+          case 'status':
+            if (message.status === 'connected') {
+              setStatus('connected')
+              reconnectDelayRef.current = INITIAL_RECONNECT_DELAY
+            } else if (message.status === 'connecting') {
+              // Server is retrying a throttled upstream handshake
+              setStatus('connecting')
+            } else if (message.status === 'error') {
+              setStatus('error')
+              onErrorRef.current?.(message.error as string || 'Connection error')
+            }
+            break
+
+          case 'speech_started':
+            setIsListening(true)
+            // Stop assistant audio playback when user starts speaking (interruption)
+            stopPlayback()
+            onInterruptRef.current?.()
+            onUserSpeechStartRef.current?.()
+            break
+
+          case 'speech_stopped':
+            setIsListening(false)
+            onUserSpeechEndRef.current?.()
+            break
+
+          case 'transcript':
+            onTranscriptRef.current?.(
+              message.role as 'user' | 'assistant',
+              message.text as string
+            )
+            break
+
+          case 'tool_result':
+            onToolResultRef.current?.(
+              message.tool as string,
+              message.result as Record<string, unknown>
+            )
+            break
+
+          case 'mode_switch':
+            onModeSwitchRef.current?.(message.payload as Record<string, unknown>)
+            break
+
+          case 'mode_generating':
+            onModeGeneratingRef.current?.((message.payload as { industry: string }).industry)
+            break
+
+          case 'visualization_generating':
+            // Loading indicator for async visualization generation
+            onToolResultRef.current?.(
+              '_generating',
+              { vis_type: message.vis_type as string, description: message.description as string }
+            )
+            break
+
+          case 'mode_generating_cancel':
+            // Signal to clear the mode generating indicator (pass empty string)
+            onModeGeneratingRef.current?.('')
+            break
+
+          case 'error':
+            onErrorRef.current?.(message.error as string)
+            break
+        }
+      } catch (err) {
+        console.warn('Failed to parse voice message:', err)
       }
-    } catch (err) {
-      console.warn('Failed to parse voice message:', err)
     }
   }, [playNextAudioChunk, stopPlayback])
 
@@ -256,6 +260,7 @@ export function useVoice(options: UseVoiceOptions = {}): UseVoiceReturn {
 
     setStatus('connecting')
     const ws = new WebSocket(VOICE_WS_URL)
+    ws.binaryType = 'arraybuffer'  // Assistant audio arrives as binary PCM16 frames
 
     ws.onopen = () => {
       // Status will be set to 'connected' when we receive status message from server
@@ -313,8 +318,8 @@ export function useVoice(options: UseVoiceOptions = {}): UseVoiceReturn {
         // Only send if not muted and WebSocket is connected
         if (!isMutedRef.current && wsRef.current?.readyState === WebSocket.OPEN) {
           const inputData = e.inputBuffer.getChannelData(0)
-          const pcm16Base64 = float32ToPcm16Base64(inputData)
-          wsRef.current.send(JSON.stringify({ type: 'audio', data: pcm16Base64 }))
+          // Raw PCM16 as a binary frame - no base64 or JSON wrapping
+          wsRef.current.send(float32ToPcm16(inputData))
         }
       }
 
@@ -14,24 +14,17 @@
 export const VOICE_SAMPLE_RATE = 24000
 
 /**
- * Convert PCM16 base64 audio to Float32Array for Web Audio API playback.
- * gpt-realtime sends audio as base64-encoded PCM16.
+ * Convert raw PCM16 audio to Float32Array for Web Audio API playback.
+ * The backend forwards gpt-realtime audio as binary PCM16 WebSocket frames.
  *
- * @param base64 - Base64-encoded PCM16 audio data
+ * @param buffer - Raw PCM16 audio bytes
  * @returns Float32Array with values in -1.0 to 1.0 range
  */
-export function pcm16ToFloat32(base64: string): Float32Array {
-  // 1. Decode base64 to bytes
-  const binaryString = atob(base64)
-  const bytes = new Uint8Array(binaryString.length)
-  for (let i = 0; i < binaryString.length; i++) {
-    bytes[i] = binaryString.charCodeAt(i)
-  }
-
-  // 2. Create Int16Array view (PCM16 = 2 bytes per sample, little-endian)
-  const int16 = new Int16Array(bytes.buffer)
+export function pcm16ToFloat32(buffer: ArrayBuffer): Float32Array {
+  // 1. Create Int16Array view (PCM16 = 2 bytes per sample, little-endian)
+  const int16 = new Int16Array(buffer)
 
-  // 3. Convert to Float32 (-1.0 to 1.0 range)
+  // 2. Convert to Float32 (-1.0 to 1.0 range)
   // PCM16 range: -32768 to 32767
   const float32 = new Float32Array(int16.length)
   for (let i = 0; i < int16.length; i++) {
@@ -43,14 +36,16 @@ export function pcm16ToFloat32(base64: string): Float32Array {
 }
 
 /**
- * Convert Float32Array audio (from mic) to base64-encoded PCM16.
+ * Convert Float32Array audio (from mic) to raw PCM16 bytes.
  * Browser MediaRecorder gives Float32 (-1.0 to 1.0), gpt-realtime needs PCM16.
+ * The bytes are sent to the backend as a binary WebSocket frame.
  *
  * @param float32 - Float32Array with values in -1.0 to 1.0 range
- * @returns Base64-encoded PCM16 audio data
+ * @returns PCM16 audio bytes (little-endian)
  */
-export function float32ToPcm16Base64(float32: Float32Array): string {
-  // 1. Convert Float32 (-1.0 to 1.0) to Int16 (-32768 to 32767)
+export function float32ToPcm16(float32: Float32Array): ArrayBuffer {
+  // Convert Float32 (-1.0 to 1.0) to Int16 (-32768 to 32767)
+  // (Int16Array is already little-endian on most platforms)
   const int16 = new Int16Array(float32.length)
   for (let i = 0; i < float32.length; i++) {
     // Clamp to prevent overflow
@@ -59,14 +54,5 @@ export function float32ToPcm16Base64(float32: Float32Array): string {
     int16[i] = clamped < 0 ? clamped * 32768 : clamped * 32767
   }
 
-  // 2. Create Uint8Array of bytes (Int16Array is already little-endian on most platforms)
-  const bytes = new Uint8Array(int16.buffer)
-
-  // 3. Encode to base64
-  let binaryString = ''
-  for (let i = 0; i < bytes.length; i++) {
-    binaryString += String.fromCharCode(bytes[i])
-  }
-
-  return btoa(binaryString)
+  return int16.buffer
 }
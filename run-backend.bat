@@ -1,4 +1,4 @@
 cd /d "%~dp0backend"
 call venv\Scripts\activate
 pip install -r requirements.txt --quiet
-python -m uvicorn main:app --reload
+python -m uvicorn main:app --reload --ws-per-message-deflate false